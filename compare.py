@@ -14,8 +14,20 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from functools import lru_cache
+from html import escape
 from pathlib import Path
+from statistics import fmean
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is optional; stdlib json also parses bytes
+    _json_loads = json.loads
 
 
 # Task display names — only these need to be known ahead of time
@@ -36,6 +48,7 @@ TASK_GROUPS = {
 }
 
 MODES = ["vanilla", "roam-cli", "roam-mcp"]
+_MODE_RANK = {m: i for i, m in enumerate(MODES)}  # lower = preferred
 
 SCORE_COLUMNS = [
     ("health", "Health", "{}", True),              # higher is better
@@ -52,101 +65,177 @@ SCORE_COLUMNS = [
 ]
 
 
-# ---------------------------------------------------------------------------
-# Data loading — everything auto-discovered from results
-# ---------------------------------------------------------------------------
+def _text_cell(fmt: str):
+    """Build the fixed-width text formatter for one score column."""
+    fmt_format = fmt.format
 
-def load_results(results_dir: Path) -> list[dict]:
-    """Load all result JSON files from a directory."""
-    results = []
-    for f in sorted(results_dir.glob("*.json")):
+    def cell(val) -> str:
+        if val is None:
+            return f" {'N/A':>8}"
+        if isinstance(val, bool):
+            return f" {'PASS' if val else 'FAIL':>8}"
         try:
-            data = json.loads(f.read_text(encoding="utf-8"))
-            results.append(data)
-        except (json.JSONDecodeError, OSError) as e:
-            print(f"Warning: skipping {f}: {e}", file=sys.stderr)
-    return results
-
+            return f" {fmt_format(val):>8}"
+        except (ValueError, TypeError):
+            return f" {str(val)[:8]:>8}"
+    return cell
 
-def discover_combos(results: list[dict]) -> list[str]:
-    """Auto-discover combo IDs from results, in a stable order."""
-    seen = {}
-    for r in results:
-        agent = r.get("agent", "?")
-        if agent not in seen:
-            seen[agent] = len(seen)
-    return sorted(seen, key=lambda a: seen[a])
 
+def _html_cell(fmt: str):
+    """Build the <td> formatter for one score column."""
+    fmt_format = fmt.format
 
-def discover_tasks(results: list[dict]) -> list[str]:
-    """Auto-discover task IDs from results, in a stable order."""
-    seen = {}
-    for r in results:
-        task = r.get("task", "?")
-        if task not in seen:
-            seen[task] = len(seen)
-    return sorted(seen, key=lambda t: seen[t])
+    def cell(val) -> str:
+        if val is None:
+            return '<td class="muted">--</td>'
+        try:
+            return f'<td class="r">{fmt_format(val)}</td>'
+        except (ValueError, TypeError):
+            return f'<td class="r">{val}</td>'
+    return cell
 
 
-def discover_groups(results: list[dict]) -> dict[str, list[str]]:
-    """Auto-discover task groups from results."""
-    groups: dict[str, set[str]] = {}
-    for r in results:
-        group = r.get("group", "standard")
-        task = r.get("task", "?")
-        groups.setdefault(group, set()).add(task)
-    # Return with stable ordering
-    return {g: sorted(tasks) for g, tasks in sorted(groups.items())}
+# (field, formatter) pairs, specialised once per column for the per-row loops
+_TEXT_COLUMNS = tuple((field, _text_cell(fmt)) for field, _, fmt, _ in SCORE_COLUMNS)
+_HTML_COLUMNS = tuple((field, _html_cell(fmt)) for field, _, fmt, _ in SCORE_COLUMNS)
 
+# Per-mode line in the text combo summary
+_SUMMARY_FMT = "  {mode:<10}  avg_health={ah:>5}  dead={dead:>3}  avg_cx={ax:>5}  tasks={tc}"
 
-def build_combo_display(results: list[dict]) -> dict[str, str]:
-    """Build display names from signature data in results."""
-    display = {}
-    for r in results:
-        agent = r.get("agent")
-        sig = r.get("signature", {})
-        if agent and sig and agent not in display:
-            d = sig.get("display")
-            if d:
-                display[agent] = d
-            else:
-                # Build from parts
-                cli = sig.get("cli_cmd", "?")
-                ver = sig.get("cli_version", "?")
-                model = sig.get("model_short", sig.get("model", "?"))
-                display[agent] = f"{cli} {ver} / {model}"
-    return display
 
+# ---------------------------------------------------------------------------
+# Data loading — everything auto-discovered from results
+# ---------------------------------------------------------------------------
 
-def build_lookup(results: list[dict]) -> dict:
-    """Build a {(agent, mode, task): scores} lookup."""
-    lookup = {}
-    for r in results:
-        key = (r.get("agent", "?"), r.get("mode", "?"), r.get("task", "?"))
-        lookup[key] = r.get("scores", {})
-    return lookup
+def _parse_one(path: str) -> dict | None:
+    """Parse one result file, returning None (with a warning) if unreadable."""
+    try:
+        with open(path, "rb") as fh:
+            return _json_loads(fh.read())
+    except (ValueError, OSError) as e:  # covers json/orjson decode errors
+        print(f"Warning: skipping {path}: {e}", file=sys.stderr)
+        return None
 
 
-def build_aqs_lookup(results: list[dict]) -> dict:
-    """Build a {(agent, mode, task): aqs_dict} lookup."""
+def load_results(results_dir: Path) -> list[dict]:
+    """Load all result JSON files from a directory."""
+    with os.scandir(results_dir) as it:
+        paths = [e.path for e in it if e.name.endswith(".json") and e.is_file()]
+    paths.sort()
+    if not paths:
+        return []
+
+    # File reads release the GIL, so small files overlap well on threads.
+    # map() keeps the sorted input order.
+    workers = min(32, (os.cpu_count() or 1) + 4, len(paths))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return [data for data in ex.map(_parse_one, paths) if data is not None]
+
+
+@dataclass
+class Loaded:
+    """Everything derived from the result files, built in a single pass."""
+    results: list[dict]
+    agents: list[str]                  # combo IDs, in first-seen order
+    tasks: list[str]                   # task IDs, in first-seen order
+    groups: dict[str, list[str]]       # {group: sorted task IDs}
+    combo_display: dict[str, str]      # {agent: display name}
+    lookup: dict          # {(agent, mode, task): scores}
+    aqs_lookup: dict      # {(agent, mode, task): aqs_dict}
+    signatures: dict      # {agent: signature}
+    best_aqs: dict        # {(agent, task): (mode, aqs_dict)}, first mode in MODES order
+    by_task: dict[str, set[str]]   # task -> agents with data
+    by_agent: dict[str, set[str]]  # agent -> tasks with data
+    combo_stats: dict     # {agent: ComboStats} over vanilla-mode results
+
+
+@dataclass
+class ComboStats:
+    """Running vanilla-mode AQS totals for one combo across all tasks."""
+    aqs_total: float = 0
+    count: int = 0
+    cat_totals: dict[str, float] = field(default_factory=dict)
+    cat_counts: dict[str, int] = field(default_factory=dict)
+
+
+def _display_name(sig: dict) -> str:
+    """Display name from a signature, built from its parts if missing."""
+    sig_get = sig.get
+    d = sig_get("display")
+    if d:
+        return d
+    cli = sig_get("cli_cmd", "?")
+    ver = sig_get("cli_version", "?")
+    model = sig_get("model_short", sig_get("model", "?"))
+    return f"{cli} {ver} / {model}"
+
+
+def load_all(results_dir: Path) -> Loaded:
+    """Load results and auto-discover combos, tasks, groups and lookups in one pass."""
+    results = load_results(results_dir)
+    # dicts used as insertion-ordered sets: first-seen order is the display order
+    agent_seen: dict[str, None] = {}
+    task_seen: dict[str, None] = {}
+    group_sets: dict[str, set[str]] = {}
+    combo_display = {}
     lookup = {}
-    for r in results:
-        key = (r.get("agent", "?"), r.get("mode", "?"), r.get("task", "?"))
-        aqs = r.get("aqs", {})
-        if aqs:
-            lookup[key] = aqs
-    return lookup
-
+    aqs_lookup = {}
+    signatures = {}
+    by_task: dict[str, set[str]] = {}
+    by_agent: dict[str, set[str]] = {}
 
-def build_signature_lookup(results: list[dict]) -> dict:
-    """Build a {agent: signature} lookup from results."""
-    sigs = {}
     for r in results:
-        agent = r.get("agent")
-        sig = r.get("signature")
+        get = r.get
+        agent = get("agent")
+        key_agent = get("agent", "?")  # missing agent sorts under "?"
+        task = get("task", "?")
+        key = (key_agent, get("mode", "?"), task)
+
+        agent_seen[key_agent] = None
+        task_seen[task] = None
+        group_sets.setdefault(get("group", "standard"), set()).add(task)
+
+        lookup[key] = get("scores", {})
+        aqs = get("aqs")
+        if aqs:
+            aqs_lookup[key] = aqs
+        sig = get("signature")
         if agent and sig:
-            sigs[agent] = sig
-    return sigs
+            signatures[agent] = sig
+            if agent not in combo_display:
+                combo_display[agent] = _display_name(sig)
+        by_task.setdefault(task, set()).add(key_agent)
+        by_agent.setdefault(key_agent, set()).add(task)
+
+    agents = list(agent_seen)
+    tasks = list(task_seen)
+    groups = {g: sorted(ts) for g, ts in sorted(group_sets.items())}
+
+    best_aqs = {}
+    combo_stats: dict[str, ComboStats] = {}
+    for (agent, mode, task), aqs in aqs_lookup.items():
+        if mode == "vanilla":
+            st = combo_stats.get(agent)
+            if st is None:
+                st = combo_stats[agent] = ComboStats()
+            st.aqs_total += aqs["aqs"]
+            st.count += 1
+            cat_totals = st.cat_totals
+            cat_counts = st.cat_counts
+            for cat, v in aqs.get("breakdown", {}).items():
+                if v is not None:
+                    cat_totals[cat] = cat_totals.get(cat, 0) + v
+                    cat_counts[cat] = cat_counts.get(cat, 0) + 1
+
+        rank = _MODE_RANK.get(mode)
+        if rank is None:
+            continue
+        cur = best_aqs.get((agent, task))
+        if cur is None or rank < _MODE_RANK[cur[0]]:
+            best_aqs[(agent, task)] = (mode, aqs)
+
+    return Loaded(results, agents, tasks, groups, combo_display, lookup,
+                  aqs_lookup, signatures, best_aqs, by_task, by_agent, combo_stats)
 
 
 # ---------------------------------------------------------------------------
@@ -159,114 +248,80 @@ def print_task_table(task: str, agents: list[str], lookup: dict, combo_display:
     print(f"  TASK: {TASK_DISPLAY.get(task, task)}")
     print(f"{'=' * 80}")
 
-    header = f"{'Combo':<30} {'Mode':<10}"
+    parts = [f"{'Combo':<30} {'Mode':<10}"]
     for _, label, _, _ in SCORE_COLUMNS:
-        header += f" {label:>8}"
+        parts.append(f" {label:>8}")
+    header = "".join(parts)
     print(header)
     print("-" * len(header))
 
+    lookup_get = lookup.get
     for agent in agents:
         for mode in MODES:
-            key = (agent, mode, task)
-            scores = lookup.get(key)
+            scores = lookup_get((agent, mode, task))
             if not scores:
                 continue
 
             display = combo_display.get(agent, agent)[:28]
-            row = f"{display:<30} {mode:<10}"
-            for field, _, fmt, _ in SCORE_COLUMNS:
-                val = scores.get(field)
-                if val is None:
-                    row += f" {'N/A':>8}"
-                elif isinstance(val, bool):
-                    row += f" {'PASS' if val else 'FAIL':>8}"
-                else:
-                    try:
-                        row += f" {fmt.format(val):>8}"
-                    except (ValueError, TypeError):
-                        row += f" {str(val)[:8]:>8}"
-            print(row)
+            parts = [f"{display:<30} {mode:<10}"]
+            scores_get = scores.get
+            parts += [cell(scores_get(field)) for field, cell in _TEXT_COLUMNS]
+            print("".join(parts))
 
 
 def print_agent_summary(agent: str, tasks: list[str], lookup: dict, combo_display: dict):
     """Print aggregate scores for one agent across all tasks."""
     display = combo_display.get(agent, agent)
     print(f"\n--- {display} ---")
+    lookup_get = lookup.get
     for mode in MODES:
-        health_scores = []
+        # Only the means are reported, so keep running sums instead of lists
+        health_sum = 0.0
+        health_n = 0
+        cx_sum = 0.0
+        cx_n = 0
         dead_total = 0
-        complexities = []
         task_count = 0
 
         for task in tasks:
-            scores = lookup.get((agent, mode, task))
+            scores = lookup_get((agent, mode, task))
             if not scores:
                 continue
             task_count += 1
-            if scores.get("health") is not None:
-                health_scores.append(scores["health"])
-            if scores.get("dead_symbols") is not None:
-                dead_total += scores["dead_symbols"]
-            if scores.get("avg_complexity") is not None:
-                complexities.append(scores["avg_complexity"])
+            get = scores.get
+            health = get("health")
+            if health is not None:
+                health_sum += health
+                health_n += 1
+            dead = get("dead_symbols")
+            if dead is not None:
+                dead_total += dead
+            cx = get("avg_complexity")
+            if cx is not None:
+                cx_sum += cx
+                cx_n += 1
 
         if task_count == 0:
             continue
 
-        avg_health = sum(health_scores) / len(health_scores) if health_scores else None
-        avg_cx = sum(complexities) / len(complexities) if complexities else None
+        avg_health = health_sum / health_n if health_n else None
+        avg_cx = cx_sum / cx_n if cx_n else None
 
-        print(f"  {mode:<10}  "
-              f"avg_health={avg_health or 'N/A':>5}  "
-              f"dead={dead_total:>3}  "
-              f"avg_cx={f'{avg_cx:.1f}' if avg_cx else 'N/A':>5}  "
-              f"tasks={task_count}")
+        print(_SUMMARY_FMT.format(
+            mode=mode,
+            ah="N/A" if avg_health is None else f"{avg_health:.1f}",
+            dead=dead_total,
+            ax="N/A" if avg_cx is None else f"{avg_cx:.1f}",
+            tc=task_count,
+        ))
 
 
 # ---------------------------------------------------------------------------
 # HTML report
 # ---------------------------------------------------------------------------
 
-def _grade_cls(grade: str) -> str:
-    return f"grade-{grade.lower()}"
-
-
-def _grade_badge(grade: str, score: int) -> str:
-    return f'<span class="badge {_grade_cls(grade)}">{score} ({grade})</span>'
-
-
-def _score_grade(score: float) -> str:
-    if score >= 90: return "A"
-    if score >= 80: return "B"
-    if score >= 70: return "C"
-    if score >= 60: return "D"
-    return "F"
-
-
-def _th(label: str, cls: str = "") -> str:
-    if cls:
-        return f'<th class="{cls}">{label}</th>'
-    return f'<th>{label}</th>'
-
-
-def _td(content: str, cls: str = "") -> str:
-    if cls:
-        return f'<td class="{cls}">{content}</td>'
-    return f'<td>{content}</td>'
-
-
-def generate_html_report(
-    lookup: dict, aqs_lookup: dict, signatures: dict,
-    combo_display: dict, agents: list[str], tasks: list[str],
-    groups: dict[str, list[str]], output: Path,
-):
-    """Generate an HTML comparison report with AQS overview."""
-    html = ["""<!DOCTYPE html>
-<html lang="en"><head><meta charset="utf-8">
-<meta name="viewport" content="width=device-width, initial-scale=1">
-<title>AI Agent Code Quality Benchmark — roam-agent-eval</title>
-<style>
-  :root {
+# Report stylesheet, inlined by default or written next to the report
+_CSS = """  :root {
     --bg: #f8f9fa; --fg: #1a1a2e; --card: white;
     --border: #e2e8f0; --hdr: #1a1a2e;
     --green: #2d8a4e; --green-bg: #e6f4ea;
@@ -354,213 +409,284 @@ def generate_html_report(
     th, td { padding: 6px 8px; }
     .bar { display: none; }
   }
-</style></head><body>
+"""
+
+_HTML_HEAD = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>AI Agent Code Quality Benchmark — roam-agent-eval</title>"""
+
+_HTML_INTRO = """</head><body>
 <h1>AI Agent Code Quality Benchmark</h1>
 <p class="subtitle">How well do AI coding agents write code? Measured by <a href="https://github.com/Cranot/roam-code">roam-code</a>.</p>
-"""]
+"""
+
+
+_GRADE_CLS = {g: f"grade-{g.lower()}" for g in "ABCDF"}
+
+
+def _grade_cls(grade: str) -> str:
+    return _GRADE_CLS.get(grade) or f"grade-{grade.lower()}"
+
+
+@lru_cache(maxsize=512)
+def _grade_badge(grade: str, score: int) -> str:
+    return f'<span class="badge {_grade_cls(grade)}">{score} ({grade})</span>'
+
+
+def _score_grade(score: float) -> str:
+    if score >= 90: return "A"
+    if score >= 80: return "B"
+    if score >= 70: return "C"
+    if score >= 60: return "D"
+    return "F"
 
-    active_agents = [a for a in agents if any(
-        (a, m, t) in aqs_lookup for m in MODES for t in tasks
-    )]
-    n_evals = sum(1 for a in agents for m in MODES for t in tasks if (a, m, t) in lookup)
 
-    html.append(f'<p class="meta">{len(tasks)} tasks &middot; '
-                f'{len(active_agents)} combos &middot; {n_evals} evaluations &middot; '
-                f'<a href="https://github.com/Cranot/roam-agent-eval">Source &amp; methodology</a></p>')
+def _th(label: str, cls: str = "") -> str:
+    if cls:
+        return f'<th class="{cls}">{label}</th>'
+    return f'<th>{label}</th>'
+
+
+def _td(content: str, cls: str = "") -> str:
+    if cls:
+        return f'<td class="{cls}">{content}</td>'
+    return f'<td>{content}</td>'
+
+
+def _iter_html(data: Loaded):
+    """Yield the HTML report body, from the intro on, fragment by fragment."""
+    lookup = data.lookup
+    aqs_lookup = data.aqs_lookup
+    signatures = data.signatures
+    agents = data.agents
+    tasks = data.tasks
+    combo_display = data.combo_display
+    best_aqs = data.best_aqs
+
+    yield _HTML_INTRO
+
+    lookup_get = lookup.get
+    aqs_get = aqs_lookup.get
+    best_get = best_aqs.get
+
+    # One sweep over the keys instead of probing every (agent, mode, task)
+    aqs_agents = {a for a, _, _ in aqs_lookup}
+    lookup_tasks = {t for _, _, t in lookup}
+    tasks_present = [t for t in tasks if t in lookup_tasks]
+    active_agents = [a for a in agents if a in aqs_agents]
+    n_evals = len(lookup)
+
+    yield (f'<p class="meta">{len(tasks)} tasks &middot; '
+           f'{len(active_agents)} combos &middot; {n_evals} evaluations &middot; '
+           f'<a href="https://github.com/Cranot/roam-agent-eval">Source &amp; methodology</a></p>')
+
+    # Loop-invariant labels and category tables, resolved once per report.
+    # Display names come from result files, so escape them here, once.
+    agent_label = {a: escape(combo_display.get(a, a)) for a in agents}
+    task_label = {t: escape(TASK_DISPLAY.get(t, t)) for t in tasks}
+    categories = ["health", "quality", "architecture", "algorithms", "testing", "completeness"]
+    cat_max = {"health": 35, "quality": 20, "architecture": 15,
+               "algorithms": 10, "testing": 15, "completeness": 5}
+    cat_bar_cls = {"health": "bar-health", "quality": "bar-quality",
+                   "architecture": "bar-arch", "algorithms": "bar-algo",
+                   "testing": "bar-testing", "completeness": "bar-complete"}
+    cat_short = {"health": "Health", "quality": "Quality", "architecture": "Arch",
+                 "algorithms": "Algo", "testing": "Testing", "completeness": "Complete"}
+    bar_max_px = 60
+    cat_info = [(c, cat_max[c], cat_bar_cls[c], cat_short[c]) for c in categories]
 
     # ---- Generate sections per group ----
-    for group_name, group_tasks in groups.items():
-        group_active_tasks = [t for t in group_tasks if any(
-            (a, m, t) in lookup for a in agents for m in MODES
-        )]
+    for group_name, group_tasks in data.groups.items():
+        group_active_tasks = [t for t in group_tasks if t in lookup_tasks]
         if not group_active_tasks:
             continue
 
-        group_cls = f"group-{group_name}"
-        group_label = f'<span class="group-label {group_cls}">{group_name}</span>'
+        # Group names come from result files too
+        group_cls = f"group-{escape(group_name)}"
+        group_label = f'<span class="group-label {group_cls}">{escape(group_name)}</span>'
 
         # ---- AQS Overview Table ----
-        html.append(f'<h2>Results: {group_name.title()} Tasks {group_label}</h2>')
-        html.append('<p>Agent Quality Score (AQS) per task. Scale: 0&ndash;100. '
-                    'Grade: A (90+), B (80+), C (70+), D (60+), F (&lt;60).</p>')
-        html.append('<table>')
-        html.append(f'<tr>{_th("Task")}')
+        yield f'<h2>Results: {escape(group_name.title())} Tasks {group_label}</h2>'
+        yield ('<p>Agent Quality Score (AQS) per task. Scale: 0&ndash;100. '
+               'Grade: A (90+), B (80+), C (70+), D (60+), F (&lt;60).</p>')
+        yield '<table>'
+        yield f'<tr>{_th("Task")}'
         for agent in active_agents:
-            html.append(_th(combo_display.get(agent, agent), "c"))
-        html.append('</tr>')
+            yield _th(agent_label[agent], "c")
+        yield '</tr>'
 
         agent_totals: dict[str, list[int]] = {a: [] for a in active_agents}
 
         for task in group_active_tasks:
-            html.append(f'<tr><td><strong>{TASK_DISPLAY.get(task, task)}</strong></td>')
+            cells = [f'<tr><td><strong>{task_label[task]}</strong></td>']
             for agent in active_agents:
-                aqs = aqs_lookup.get((agent, "vanilla", task))
-                if not aqs:
-                    for mode in MODES:
-                        aqs = aqs_lookup.get((agent, mode, task))
-                        if aqs:
-                            break
-                if aqs:
-                    html.append(_td(_grade_badge(aqs["grade"], aqs["aqs"]), "c"))
+                best = best_get((agent, task))
+                if best:
+                    aqs = best[1]
+                    cells.append(f'<td class="c">{_grade_badge(aqs["grade"], aqs["aqs"])}</td>')
                     agent_totals[agent].append(aqs["aqs"])
                 else:
-                    html.append(_td("--", "muted"))
-            html.append('</tr>')
+                    cells.append('<td class="muted">--</td>')
+            cells.append('</tr>')
+            yield "".join(cells)
 
         # Average row
-        html.append('<tr class="summary"><td><strong>Average</strong></td>')
+        yield '<tr class="summary"><td><strong>Average</strong></td>'
         for agent in active_agents:
             scores = agent_totals[agent]
             if scores:
-                avg = sum(scores) / len(scores)
+                avg = fmean(scores)
                 g = _score_grade(avg)
-                html.append(_td(_grade_badge(g, round(avg)), "c"))
+                yield _td(_grade_badge(g, round(avg)), "c")
             else:
-                html.append(_td("--", "muted"))
-        html.append('</tr></table>')
+                yield _td("--", "muted")
+        yield '</tr></table>'
 
         # ---- Category Breakdown ----
-        categories = ["health", "quality", "architecture", "algorithms", "testing", "completeness"]
-        cat_max = {"health": 35, "quality": 20, "architecture": 15,
-                   "algorithms": 10, "testing": 15, "completeness": 5}
-        cat_bar_cls = {"health": "bar-health", "quality": "bar-quality",
-                       "architecture": "bar-arch", "algorithms": "bar-algo",
-                       "testing": "bar-testing", "completeness": "bar-complete"}
-        cat_short = {"health": "Health", "quality": "Quality", "architecture": "Arch",
-                     "algorithms": "Algo", "testing": "Testing", "completeness": "Complete"}
-        bar_max_px = 60
-
-        html.append(f'<h3>Category Breakdown</h3>')
-        html.append('<p>AQS breaks into 6 categories: Health (35), Quality (20), '
-                    'Architecture (15), Algorithms (10), Testing (15), Completeness (5).</p>')
+        yield f'<h3>Category Breakdown</h3>'
+        yield ('<p>AQS breaks into 6 categories: Health (35), Quality (20), '
+               'Architecture (15), Algorithms (10), Testing (15), Completeness (5).</p>')
 
         for task in group_active_tasks:
-            html.append(f'<h3>{TASK_DISPLAY.get(task, task)}</h3>')
-            html.append(f'<table><tr>{_th("Combo")}{_th("AQS", "c")}')
-            for cat in categories:
-                html.append(_th(f'{cat_short[cat]} /{cat_max[cat]}', "r"))
-            html.append('</tr>')
+            yield f'<h3>{task_label[task]}</h3>'
+            yield f'<table><tr>{_th("Combo")}{_th("AQS", "c")}'
+            for _, mx, _, short in cat_info:
+                yield f'<th class="r">{short} /{mx}</th>'
+            yield '</tr>'
 
             for agent in active_agents:
-                aqs = aqs_lookup.get((agent, "vanilla", task))
+                aqs = aqs_get((agent, "vanilla", task))
                 if not aqs:
                     continue
                 bd = aqs.get("breakdown", {})
-                html.append(f'<tr><td>{combo_display.get(agent, agent)}</td>')
-                html.append(_td(f'<strong>{aqs["aqs"]}</strong>', "c"))
-                for cat in categories:
+                cells = [f'<tr><td>{agent_label[agent]}</td>',
+                         f'<td class="c"><strong>{aqs["aqs"]}</strong></td>']
+                for cat, mx, bar_cls, _ in cat_info:
                     val = bd.get(cat, 0)
-                    mx = cat_max[cat]
                     pct = val / mx if mx > 0 else 0
                     px = round(pct * bar_max_px)
-                    bar = f'<span class="bar {cat_bar_cls[cat]}" style="width:{px}px"></span>'
-                    html.append(_td(f'{val}{bar}', "r"))
-                html.append('</tr>')
-            html.append('</table>')
+                    bar = f'<span class="bar {bar_cls}" style="width:{px}px"></span>'
+                    cells.append(f'<td class="r">{val}{bar}</td>')
+                cells.append('</tr>')
+                yield "".join(cells)
+            yield '</table>'
 
     # ---- Overall Combo Averages ----
-    categories = ["health", "quality", "architecture", "algorithms", "testing", "completeness"]
-    cat_max = {"health": 35, "quality": 20, "architecture": 15,
-               "algorithms": 10, "testing": 15, "completeness": 5}
-    cat_short = {"health": "Health", "quality": "Quality", "architecture": "Arch",
-                 "algorithms": "Algo", "testing": "Testing", "completeness": "Complete"}
-
-    html.append('<h2>Combo Averages (All Tasks)</h2>')
-    html.append('<p>Average scores across all tasks (vanilla mode).</p>')
-    html.append(f'<table><tr>{_th("Combo")}{_th("Avg AQS", "c")}')
-    for cat in categories:
-        html.append(_th(f'Avg {cat_short[cat]}', "r"))
-    html.append('</tr>')
-
+    yield '<h2>Combo Averages (All Tasks)</h2>'
+    yield '<p>Average scores across all tasks (vanilla mode).</p>'
+    yield f'<table><tr>{_th("Combo")}{_th("Avg AQS", "c")}'
+    for _, _, _, short in cat_info:
+        yield f'<th class="r">Avg {short}</th>'
+    yield '</tr>'
+
+    combo_stats_get = data.combo_stats.get
     for agent in active_agents:
-        cat_sums: dict[str, list] = {c: [] for c in categories}
-        aqs_scores: list[int] = []
-        for task in tasks:
-            aqs = aqs_lookup.get((agent, "vanilla", task))
-            if not aqs:
-                continue
-            aqs_scores.append(aqs["aqs"])
-            bd = aqs.get("breakdown", {})
-            for cat in categories:
-                if cat in bd:
-                    cat_sums[cat].append(bd[cat])
-
-        if not aqs_scores:
+        st = combo_stats_get(agent)
+        if st is None:
             continue
 
-        avg_aqs = sum(aqs_scores) / len(aqs_scores)
+        avg_aqs = st.aqs_total / st.count
         g = _score_grade(avg_aqs)
 
-        html.append(f'<tr><td>{combo_display.get(agent, agent)}</td>')
-        html.append(_td(_grade_badge(g, round(avg_aqs)), "c"))
-        for cat in categories:
-            vals = cat_sums[cat]
-            if vals:
-                avg = sum(vals) / len(vals)
-                html.append(_td(f'{avg:.1f}/{cat_max[cat]}', "r"))
+        cells = [f'<tr><td>{agent_label[agent]}</td>', _td(_grade_badge(g, round(avg_aqs)), "c")]
+        cat_totals = st.cat_totals
+        cat_counts_get = st.cat_counts.get
+        for cat, mx, _, _ in cat_info:
+            count = cat_counts_get(cat)
+            if count:
+                cells.append(_td(f'{cat_totals[cat] / count:.1f}/{mx}', "r"))
             else:
-                html.append(_td("--", "muted"))
-        html.append('</tr>')
-    html.append('</table>')
+                cells.append(_td("--", "muted"))
+        cells.append('</tr>')
+        yield "".join(cells)
+    yield '</table>'
 
     # ---- Combo Signatures ----
     if signatures:
-        html.append('<h2>Combo Signatures</h2>')
-        html.append(f'<table><tr>{_th("Combo")}{_th("CLI Tool")}{_th("CLI Version")}{_th("Model")}</tr>')
+        yield '<h2>Combo Signatures</h2>'
+        yield f'<table><tr>{_th("Combo")}{_th("CLI Tool")}{_th("CLI Version")}{_th("Model")}</tr>'
         for agent in active_agents:
             sig = signatures.get(agent, {})
             if sig:
-                html.append(f'<tr><td>{combo_display.get(agent, agent)}</td>'
-                            f'<td>{sig.get("cli_cmd", "N/A")}</td>'
-                            f'<td>{sig.get("cli_version", "N/A")}</td>'
-                            f'<td>{sig.get("model", "N/A")}</td></tr>')
+                sig_get = sig.get
+                yield (f'<tr><td>{agent_label[agent]}</td>'
+                       f'<td>{escape(str(sig_get("cli_cmd", "N/A")))}</td>'
+                       f'<td>{escape(str(sig_get("cli_version", "N/A")))}</td>'
+                       f'<td>{escape(str(sig_get("model", "N/A")))}</td></tr>')
         roam_ver = next((s.get("roam_version") for s in signatures.values() if s.get("roam_version")), None)
-        html.append('</table>')
+        yield '</table>'
         if roam_ver:
-            html.append(f'<p>Evaluator: <strong>roam-code {roam_ver}</strong></p>')
+            yield f'<p>Evaluator: <strong>roam-code {escape(str(roam_ver))}</strong></p>'
 
     # ---- Raw Metrics Tables ----
-    html.append('<h2>Raw Metrics by Task</h2>')
-    html.append('<p>Detailed roam-code metrics for each task and combo.</p>')
+    yield '<h2>Raw Metrics by Task</h2>'
+    yield '<p>Detailed roam-code metrics for each task and combo.</p>'
 
-    for task in tasks:
-        if not any((a, m, task) in lookup for a in agents for m in MODES):
-            continue
-        html.append(f'<h3>{TASK_DISPLAY.get(task, task)}</h3>')
-        html.append(f'<table><tr>{_th("Combo")}{_th("Mode")}')
+    for task in tasks_present:
+        yield f'<h3>{task_label[task]}</h3>'
+        yield f'<table><tr>{_th("Combo")}{_th("Mode")}'
         for _, label, _, _ in SCORE_COLUMNS:
-            html.append(_th(label, "r"))
-        html.append('</tr>')
+            yield f'<th class="r">{label}</th>'
+        yield '</tr>'
 
         for agent in agents:
             for mode in MODES:
-                scores = lookup.get((agent, mode, task))
+                scores = lookup_get((agent, mode, task))
                 if not scores:
                     continue
-                html.append(f'<tr><td>{combo_display.get(agent, agent)}</td><td>{mode}</td>')
-                for field, _, fmt, _ in SCORE_COLUMNS:
-                    val = scores.get(field)
-                    if val is None:
-                        html.append(_td("--", "muted"))
-                    else:
-                        try:
-                            formatted = fmt.format(val)
-                        except (ValueError, TypeError):
-                            formatted = str(val)
-                        html.append(_td(formatted, "r"))
-                html.append('</tr>')
-        html.append('</table>')
+                scores_get = scores.get
+                cells = "".join([cell(scores_get(field)) for field, cell in _HTML_COLUMNS])
+                yield f'<tr><td>{agent_label[agent]}</td><td>{mode}</td>{cells}</tr>'
+        yield '</table>'
 
     # ---- Footer ----
-    html.append("""<footer>
+    yield """<footer>
 <p>Generated by <a href="https://github.com/Cranot/roam-agent-eval">roam-agent-eval</a>
 &middot; Evaluated with <a href="https://github.com/Cranot/roam-code">roam-code</a></p>
 </footer>
-</body></html>""")
-
-    output.parent.mkdir(parents=True, exist_ok=True)
-    output.write_text("\n".join(html), encoding="utf-8")
-    print(f"HTML report saved to: {output}")
+</body></html>"""
+
+
+def _html_head(css_href: str | None) -> str:
+    """Document head up to the opening intro, with inline or linked CSS."""
+    if css_href:
+        return f'{_HTML_HEAD}\n<link rel="stylesheet" href="{css_href}">'
+    return f"{_HTML_HEAD}\n<style>\n{_CSS}</style>"
+
+
+def generate_html_report(data: Loaded, outputs: list[tuple[Path, str | None]]):
+    """Generate an HTML comparison report with AQS overview.
+
+    ``outputs`` is a list of ``(path, css_href)`` pairs. The report body is
+    rendered once and streamed to every output that needs it. With a
+    ``css_href`` the stylesheet is written next to that output under that
+    name and linked instead of inlined.
+    """
+    for output, css_href in outputs:
+        if css_href:
+            css_path = output.parent / css_href
+            if not css_path.is_file() or css_path.read_text(encoding="utf-8") != _CSS:
+                css_path.parent.mkdir(parents=True, exist_ok=True)
+                css_path.write_text(_CSS, encoding="utf-8")
+
+    with ExitStack() as stack:
+        writers = []
+        for output, css_href in outputs:
+            output.parent.mkdir(parents=True, exist_ok=True)
+            tmp = output.with_name(output.name + ".tmp")
+            fh = stack.enter_context(tmp.open("w", encoding="utf-8", buffering=1 << 16))
+            fh.write(_html_head(css_href))
+            fh.write("\n")
+            writers.append(fh.write)
+        for fragment in _iter_html(data):
+            for write in writers:
+                write(fragment)
+                write("\n")
+
+    for output, _ in outputs:
+        os.replace(output.with_name(output.name + ".tmp"), output)
+        print(f"HTML report saved to: {output}")
 
 
 # ---------------------------------------------------------------------------
@@ -579,21 +705,20 @@ def main():
         print(f"Error: {args.results_dir} is not a directory")
         sys.exit(1)
 
-    results = load_results(args.results_dir)
+    data = load_all(args.results_dir)
+    results = data.results
     if not results:
         print("No result files found.")
         sys.exit(1)
 
     print(f"Loaded {len(results)} result files.\n")
 
-    # Auto-discover everything from the data
-    agents = discover_combos(results)
-    tasks = discover_tasks(results)
-    groups = discover_groups(results)
-    combo_display = build_combo_display(results)
-    lookup = build_lookup(results)
-    aqs_lookup = build_aqs_lookup(results)
-    signatures = build_signature_lookup(results)
+    # Everything is auto-discovered from the data
+    agents = data.agents
+    tasks = data.tasks
+    combo_display = data.combo_display
+    lookup = data.lookup
+    signatures = data.signatures
 
     # Print combo signatures
     if signatures:
@@ -614,7 +739,7 @@ def main():
 
     # Print per-task tables
     for task in tasks:
-        if any(k[2] == task for k in lookup):
+        if task in data.by_task:
             print_task_table(task, agents, lookup, combo_display)
 
     # Combo summaries
@@ -622,19 +747,17 @@ def main():
     print("  COMBO SUMMARIES")
     print(f"{'=' * 80}")
     for agent in agents:
-        if any(k[0] == agent for k in lookup):
+        if agent in data.by_agent:
             print_agent_summary(agent, tasks, lookup, combo_display)
 
-    # HTML report
+    # HTML report, plus docs/ for GitHub Pages -- rendered once for both
+    outputs = []
     if args.html:
-        generate_html_report(lookup, aqs_lookup, signatures,
-                             combo_display, agents, tasks, groups, args.html)
-
-    # Also output to docs/ for GitHub Pages
+        outputs.append((args.html, None))
     if args.docs:
-        docs_path = Path(__file__).parent / "docs" / "index.html"
-        generate_html_report(lookup, aqs_lookup, signatures,
-                             combo_display, agents, tasks, groups, docs_path)
+        outputs.append((Path(__file__).parent / "docs" / "index.html", "style.css"))
+    if outputs:
+        generate_html_report(data, outputs)
 
 
 if __name__ == "__main__":
@@ -32,7 +32,7 @@ COMBOS_FILE = BASE_DIR / "combos.json"
 def load_combos() -> dict:
     """Load combo definitions from combos.json."""
     if COMBOS_FILE.is_file():
-        return json.loads(COMBOS_FILE.read_text(encoding="utf-8"))
+        return json.loads(COMBOS_FILE.read_bytes())
     return {}
 
 
@@ -17,47 +17,115 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import asyncio
+import codecs
 import json
 import os
+import shlex
+import shutil
+import signal
 import subprocess
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
 
 from prompts import TASKS
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is optional; stdlib json also parses bytes
+    _json_loads = json.loads
+
 
 BASE_DIR = Path(__file__).parent
 WORKSPACES_DIR = BASE_DIR / "workspaces"
 PROMPTS_DIR = BASE_DIR / "prompts"
 COMBOS_FILE = BASE_DIR / "combos.json"
 LOG_DIR = BASE_DIR / "logs"
+# Completed workspaces from earlier runs: {"combo/task/mode": {"mtime_ns": ..., ...}}
+MANIFEST_FILE = WORKSPACES_DIR / ".manifest.json"
 
 MODES = ["vanilla"]  # only vanilla for generation
 
-# Task group mapping
-TASK_GROUPS = {}
-for tid, tdef in TASKS.items():
-    TASK_GROUPS[tid] = tdef.get("group", "standard")
+# Relative expected run time per task group, used to start the longest jobs
+# first under --parallel (algorithm tasks are the larger builds)
+GROUP_WEIGHTS = {"algorithm": 2, "standard": 1}
 
 
 def load_combos() -> dict:
     """Load combo definitions from combos.json."""
     if COMBOS_FILE.is_file():
-        return json.loads(COMBOS_FILE.read_text(encoding="utf-8"))
+        return _json_loads(COMBOS_FILE.read_bytes())
     return {}
 
 
 def count_workspace_files(ws_dir: Path) -> int:
     """Count files in workspace (excluding .git)."""
-    if not ws_dir.is_dir():
+    try:
+        with os.scandir(ws_dir) as it:
+            return sum(1 for e in it if e.name != ".git" and e.is_file())
+    except (FileNotFoundError, NotADirectoryError):
         return 0
-    count = 0
-    for f in ws_dir.iterdir():
-        if f.name != ".git" and f.is_file():
-            count += 1
-    return count
+
+
+def load_manifest() -> dict:
+    """Load the completed-workspace manifest; empty if missing or unreadable."""
+    try:
+        return _json_loads(MANIFEST_FILE.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest: dict):
+    """Write the manifest atomically (tmp file + rename)."""
+    tmp = MANIFEST_FILE.with_name(MANIFEST_FILE.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, MANIFEST_FILE)
+
+
+def dir_mtime_ns(path: Path) -> int | None:
+    """Directory mtime in ns, or None if it does not exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def has_prompt_files() -> bool:
+    """True if at least one exported prompt file exists."""
+    try:
+        with os.scandir(PROMPTS_DIR) as it:
+            return any(e.name.endswith(".txt") for e in it)
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+
+
+def workspace_has_files(ws_dir: Path) -> bool:
+    """True if the workspace holds at least one file (excluding .git).
+
+    Stops at the first file found; the skip check in build_job_list
+    does not need the full count.
+    """
+    try:
+        with os.scandir(ws_dir) as it:
+            return any(e.name != ".git" and e.is_file() for e in it)
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+
+
+def split_invoke(invoke: str) -> list[str]:
+    """Split a combos.json ``invoke`` string into argv.
+
+    shlex honours quoted arguments, e.g. --system "be brief". On Windows it
+    runs in non-POSIX mode so backslashes in paths like C:\\tools\\agent.exe
+    are kept; that mode leaves the quotes on quoted tokens, so strip them.
+    """
+    if os.name != "nt":
+        return shlex.split(invoke)
+    return [part[1:-1] if len(part) >= 2 and part[0] == part[-1] and part[0] in "\"'" else part
+            for part in shlex.split(invoke, posix=False)]
 
 
 def build_job_list(
@@ -66,39 +134,73 @@ def build_job_list(
     task_filter: str | None = None,
     group_filter: str | None = None,
     force: bool = False,
+    manifest: dict | None = None,
 ) -> list[dict]:
-    """Build list of generation jobs to run."""
+    """Build list of generation jobs to run.
+
+    A workspace recorded in ``manifest`` whose directory mtime still matches
+    is skipped with a single stat. Otherwise its contents are scanned, and a
+    populated workspace found that way is added to ``manifest`` for next time.
+    """
     jobs = []
+    if manifest is None:
+        manifest = {}
+
+    # One listing of prompts/ instead of a stat per (combo, task, mode)
+    try:
+        with os.scandir(PROMPTS_DIR) as it:
+            available_prompts = {e.name for e in it if e.is_file()}
+    except (FileNotFoundError, NotADirectoryError):
+        available_prompts = set()
 
     for combo_id, meta in combos_meta.items():
         if combo_filter and combo_id != combo_filter:
             continue
 
         invoke = meta.get("invoke", "")
-        if not invoke:
+        try:
+            base_cmd = split_invoke(invoke)
+        except ValueError as e:
+            print(f"SKIP {combo_id}: bad invoke command in combos.json ({e})")
+            continue
+        if not base_cmd:
             print(f"SKIP {combo_id}: no invoke command in combos.json")
             continue
 
-        for task_id in TASKS:
+        # Resolve the executable once per combo, not once per job.
+        # On Windows this is what finds .cmd/.bat shims via PATHEXT.
+        base_cmd[0] = shutil.which(base_cmd[0]) or base_cmd[0]
+
+        for task_id, tdef in TASKS.items():
             if task_filter and task_id != task_filter:
                 continue
 
-            group = TASK_GROUPS.get(task_id, "standard")
+            group = tdef.get("group", "standard")
             if group_filter and group != group_filter:
                 continue
 
             for mode in MODES:
                 ws_dir = WORKSPACES_DIR / combo_id / f"{task_id}_{mode}"
-                prompt_file = PROMPTS_DIR / f"{task_id}_{mode}.txt"
+                prompt_name = f"{task_id}_{mode}.txt"
+                prompt_file = PROMPTS_DIR / prompt_name
 
-                if not prompt_file.is_file():
+                if prompt_name not in available_prompts:
                     print(f"SKIP {combo_id} / {task_id} / {mode}: no prompt file")
                     continue
 
-                file_count = count_workspace_files(ws_dir)
-                if not force and file_count > 0:
-                    print(f"SKIP {combo_id} / {task_id} / {mode} ({file_count} files exist)")
-                    continue
+                if not force:
+                    key = f"{combo_id}/{task_id}/{mode}"
+                    entry = manifest.get(key)
+                    mtime = dir_mtime_ns(ws_dir)
+                    if (entry is not None and entry.get("files") != 0
+                            and mtime is not None and entry.get("mtime_ns") == mtime):
+                        print(f"SKIP {combo_id} / {task_id} / {mode} (generated)")
+                        continue
+                    if workspace_has_files(ws_dir):
+                        manifest[key] = {"mtime_ns": mtime}
+                        print(f"SKIP {combo_id} / {task_id} / {mode} (files exist)")
+                        continue
+                    manifest.pop(key, None)
 
                 jobs.append({
                     "combo": combo_id,
@@ -108,90 +210,183 @@ def build_job_list(
                     "ws_dir": ws_dir,
                     "prompt_file": prompt_file,
                     "invoke": invoke,
+                    "base_cmd": base_cmd,
+                    "stdin": bool(meta.get("stdin")),
                 })
 
     return jobs
 
 
-def run_job(job: dict) -> dict:
-    """Execute a single generation job. Returns result dict."""
-    import shutil
+@lru_cache(maxsize=None)
+def load_prompt(prompt_file: Path) -> str:
+    """Read a prompt file once per run; every combo gets the same text for a task."""
+    return prompt_file.read_text(encoding="utf-8")
 
-    combo = job["combo"]
-    task = job["task"]
-    mode = job["mode"]
-    ws_dir = job["ws_dir"]
-    prompt_file = job["prompt_file"]
-    invoke = job["invoke"]
 
-    log_file = LOG_DIR / f"{combo}_{task}_{mode}.log"
+def build_agent_env() -> dict:
+    """Environment shared by every agent subprocess."""
+    env = os.environ.copy()
+    # Unset CLAUDECODE to allow nested invocation
+    env.pop("CLAUDECODE", None)
+    # Force UTF-8 encoding to handle non-ASCII output on Windows
+    env["PYTHONIOENCODING"] = "utf-8"
+    return env
 
-    print(f"[START] {combo} / {task} / {mode}")
 
-    # Ensure workspace dir exists
-    ws_dir.mkdir(parents=True, exist_ok=True)
+async def _copy_output(proc: asyncio.subprocess.Process, f) -> int:
+    """Copy the agent's output into the open log as it arrives; return the exit code."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        chunk = await proc.stdout.read(1 << 16)
+        if not chunk:
+            break
+        f.write(decoder.decode(chunk))
+        f.flush()
+    f.write(decoder.decode(b"", final=True))
+    return await proc.wait()
 
-    # Read prompt
-    prompt = prompt_file.read_text(encoding="utf-8")
 
-    # Unset CLAUDECODE to allow nested invocation
-    env = os.environ.copy()
-    env.pop("CLAUDECODE", None)
+# Run each agent in its own process group / session so that a timeout (or
+# Ctrl-C) can stop the node/python runtimes it spawns, not just the CLI itself
+if os.name == "nt":
+    _GROUP_KWARGS = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    _GROUP_KWARGS = {"start_new_session": True}
 
-    # Build command parts
-    cmd_parts = invoke.split() + [prompt]
+KILL_GRACE = 10  # seconds between the polite stop signal and the hard kill
 
-    # On Windows, resolve .cmd/.bat executables via shutil.which()
-    cli_exe = shutil.which(cmd_parts[0])
-    if cli_exe:
-        cmd_parts[0] = cli_exe
 
-    start_time = time.time()
+async def _terminate_tree(proc: asyncio.subprocess.Process) -> int:
+    """Stop an agent and its whole process group; return its exit code.
 
+    The hard kill always goes to the whole group after the grace period,
+    even if the agent itself exited on the polite signal: its children may
+    ignore SIGTERM and would otherwise be left running.
+    """
     try:
-        # Force UTF-8 encoding to handle non-ASCII output on Windows
-        env["PYTHONIOENCODING"] = "utf-8"
-        result = subprocess.run(
-            cmd_parts,
-            cwd=str(ws_dir),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=600,  # 10 minute timeout per task
-            env=env,
-        )
-        stdout = result.stdout.decode("utf-8", errors="replace") if result.stdout else ""
-        stderr = result.stderr.decode("utf-8", errors="replace") if result.stderr else ""
-        duration = time.time() - start_time
-
-        # Write log
-        LOG_DIR.mkdir(parents=True, exist_ok=True)
-        with open(log_file, "w", encoding="utf-8") as f:
-            f.write(f"=== {combo} / {task} / {mode} ===\n")
-            f.write(f"Command: {invoke} <prompt>\n")
-            f.write(f"Duration: {duration:.1f}s\n")
-            f.write(f"Exit code: {result.returncode}\n\n")
-            f.write("=== STDOUT ===\n")
-            f.write(stdout)
-            f.write("\n=== STDERR ===\n")
-            f.write(stderr)
-
-        # Count output files
-        out_files = count_workspace_files(ws_dir)
-
-        if result.returncode == 0:
-            print(f"[DONE]  {combo} / {task} / {mode} ({duration:.0f}s, {out_files} files)")
-            return {"status": "success", "combo": combo, "task": task, "duration": duration, "files": out_files}
+        if os.name == "nt":
+            proc.send_signal(signal.CTRL_BREAK_EVENT)
         else:
-            print(f"[FAIL]  {combo} / {task} / {mode} (exit={result.returncode}, {duration:.0f}s)")
-            return {"status": "failed", "combo": combo, "task": task, "exit_code": result.returncode}
+            os.killpg(proc.pid, signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        pass  # already gone
+    try:
+        await asyncio.wait_for(proc.wait(), timeout=KILL_GRACE)
+    except asyncio.TimeoutError:
+        pass
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass  # the whole group is already gone
+    return await proc.wait()
 
-    except subprocess.TimeoutExpired:
-        duration = time.time() - start_time
-        print(f"[TIMEOUT] {combo} / {task} / {mode} ({duration:.0f}s)")
-        return {"status": "timeout", "combo": combo, "task": task}
-    except Exception as e:
-        print(f"[ERROR] {combo} / {task} / {mode}: {e}")
-        return {"status": "error", "combo": combo, "task": task, "error": str(e)}
+
+async def run_job(job: dict, env: dict, sem: asyncio.Semaphore) -> dict:
+    """Execute a single generation job with the given environment. Returns result dict.
+
+    At most ``sem``'s worth of jobs run at once. Expects LOG_DIR and the
+    job's workspace directory to exist already.
+    """
+    combo = job["combo"]
+    task = job["task"]
+    mode = job["mode"]
+    ws_dir = job["ws_dir"]
+    prompt_file = job["prompt_file"]
+    invoke = job["invoke"]
+
+    log_file = LOG_DIR / f"{combo}_{task}_{mode}.log"
+
+    async with sem:
+        print(f"[START] {combo} / {task} / {mode}")
+
+        # Command prefix is parsed and resolved once per combo in build_job_list.
+        # Combos with "stdin": true get the prompt file as stdin instead of an
+        # argv element, so prompt size is not bounded by ARG_MAX.
+        if job["stdin"]:
+            cmd_parts = job["base_cmd"]
+            prompt_arg = "< prompt"
+        else:
+            cmd_parts = [*job["base_cmd"], load_prompt(prompt_file)]
+            prompt_arg = "<prompt>"
+
+        start_time = time.monotonic()
+
+        try:
+            # Stream the agent's output into the log as it arrives, instead of
+            # buffering up to 10 minutes of it in memory. stderr is merged into
+            # stdout so the log keeps the order the agent printed things in.
+            with open(log_file, "w", encoding="utf-8") as f:
+                f.write(f"=== {combo} / {task} / {mode} ===\n"
+                        f"Command: {invoke} {prompt_arg}\n\n"
+                        "=== OUTPUT ===\n")
+                f.flush()
+
+                # The child gets its own copy of the descriptor, so the
+                # prompt file can be closed as soon as it has started
+                stdin_src = open(prompt_file, "rb") if job["stdin"] else None
+                try:
+                    proc = await asyncio.create_subprocess_exec(
+                        *cmd_parts,
+                        cwd=str(ws_dir),
+                        stdin=stdin_src,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.STDOUT,
+                        env=env,
+                        **_GROUP_KWARGS,
+                    )
+                finally:
+                    if stdin_src is not None:
+                        stdin_src.close()
+                timed_out = False
+                try:
+                    # 10 minute timeout per task
+                    returncode = await asyncio.wait_for(_copy_output(proc, f), timeout=600)
+                except asyncio.TimeoutError:
+                    timed_out = True
+                    returncode = await _terminate_tree(proc)
+                    # wait_for cancelled the copy; read the pipe to EOF so the
+                    # transport closes cleanly, logging what the agent printed
+                    # while it was being stopped
+                    f.write((await proc.stdout.read()).decode("utf-8", errors="replace"))
+                except asyncio.CancelledError:
+                    # Interrupted: in its own group the agent never saw the
+                    # Ctrl-C, so stop it explicitly before unwinding
+                    await _terminate_tree(proc)
+                    raise
+                duration = time.monotonic() - start_time
+
+                f.write("\n=== END ===\n"
+                        f"Duration: {duration:.1f}s\n"
+                        f"Exit code: {'timeout' if timed_out else returncode}\n")
+
+            if timed_out:
+                print(f"[TIMEOUT] {combo} / {task} / {mode} ({duration:.0f}s)")
+                return {"status": "timeout", "combo": combo, "task": task}
+
+            # Count output files
+            out_files = count_workspace_files(ws_dir)
+
+            if returncode == 0:
+                print(f"[DONE]  {combo} / {task} / {mode} ({duration:.0f}s, {out_files} files)")
+                return {"status": "success", "combo": combo, "task": task, "mode": mode,
+                        "duration": duration, "files": out_files}
+            else:
+                print(f"[FAIL]  {combo} / {task} / {mode} (exit={returncode}, {duration:.0f}s)")
+                return {"status": "failed", "combo": combo, "task": task, "exit_code": returncode}
+
+        except Exception as e:
+            print(f"[ERROR] {combo} / {task} / {mode}: {e}")
+            return {"status": "error", "combo": combo, "task": task, "error": str(e)}
+
+
+async def run_all(jobs: list[dict], env: dict, parallel: int) -> list[dict]:
+    """Run all jobs on one event loop, at most ``parallel`` at a time, in job order."""
+    sem = asyncio.Semaphore(max(1, parallel))
+    return await asyncio.gather(*(run_job(job, env, sem) for job in jobs))
 
 
 def main():
@@ -204,23 +399,32 @@ def main():
     parser.add_argument("--parallel", type=int, default=1, help="Max concurrent agents")
     args = parser.parse_args()
 
-    # Ensure prompts are exported
-    if not PROMPTS_DIR.is_dir() or not list(PROMPTS_DIR.glob("*.txt")):
+    # Ensure prompts are exported; the export runs in the background while
+    # combos.json is loaded, and must finish before the job list is built
+    export = None
+    if not has_prompt_files():
         print("Exporting prompts...")
-        subprocess.run([sys.executable, str(BASE_DIR / "run_eval.py"), "--export-prompts"])
+        export = subprocess.Popen([sys.executable, str(BASE_DIR / "run_eval.py"), "--export-prompts"])
 
     combos_meta = load_combos()
+    if export is not None:
+        export.wait()
     if not combos_meta:
         print("Error: combos.json not found or empty")
         sys.exit(1)
 
+    manifest = load_manifest()
+    known = dict(manifest)
     jobs = build_job_list(
         combos_meta,
         combo_filter=args.combo,
         task_filter=args.task,
         group_filter=args.group,
         force=args.force,
+        manifest=manifest,
     )
+    if manifest != known and not args.dry_run:
+        save_manifest(manifest)
 
     total_combos = len(combos_meta) if not args.combo else 1
     total_tasks = len(TASKS) if not args.task else 1
@@ -237,23 +441,49 @@ def main():
         for job in jobs:
             print(f"  {job['combo']} / {job['task']} / {job['mode']}")
             print(f"    DIR: {job['ws_dir']}")
-            print(f"    CMD: {job['invoke']} <prompt>")
+            print(f"    CMD: {job['invoke']} {'< prompt' if job['stdin'] else '<prompt>'}")
         return
 
-    # Execute jobs
-    results = []
-    if args.parallel <= 1:
-        for job in jobs:
-            results.append(run_job(job))
-    else:
-        with ThreadPoolExecutor(max_workers=args.parallel) as executor:
-            futures = {executor.submit(run_job, job): job for job in jobs}
-            for future in as_completed(futures):
-                results.append(future.result())
+    # Create output directories sequentially up front, so run_job (and
+    # parallel workers) can assume they exist
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    for job in jobs:
+        job["ws_dir"].mkdir(parents=True, exist_ok=True)
+
+    # Execute jobs; the agent environment is built once and shared read-only
+    env = build_agent_env()
+    if args.parallel > 1:
+        # Longest-first (LPT) dispatch: start the heavy jobs early so one
+        # slow task doesn't run alone at the end. sorted() is stable, so
+        # equal-weight jobs keep their combo/task order.
+        jobs = sorted(jobs, key=lambda j: -GROUP_WEIGHTS.get(j["group"], 1))
+    # Each job only waits on an agent subprocess, so a single asyncio loop
+    # drives all of them; the semaphore caps how many agents run at once
+    # and admits jobs in list order (--parallel 1 runs them serially).
+    results = asyncio.run(run_all(jobs, env, args.parallel))
+
+    # Record finished workspaces so the next run can skip them with one stat.
+    # An agent that exits 0 without writing any files is not finished, so it
+    # stays out of the manifest and is queued again next time.
+    for r in results:
+        if r["status"] != "success":
+            continue
+        key = f"{r['combo']}/{r['task']}/{r['mode']}"
+        if r["files"] > 0:
+            ws_dir = WORKSPACES_DIR / r["combo"] / f"{r['task']}_{r['mode']}"
+            manifest[key] = {
+                "mtime_ns": dir_mtime_ns(ws_dir),
+                "files": r["files"],
+                "duration": round(r["duration"], 1),
+            }
+        else:
+            manifest.pop(key, None)
+    save_manifest(manifest)
 
     # Summary
-    success = sum(1 for r in results if r["status"] == "success")
-    failed = sum(1 for r in results if r["status"] != "success")
+    status_counts = Counter(r["status"] for r in results)
+    success = status_counts["success"]
+    failed = len(results) - success
     print(f"\n=== Generation Complete ===")
     print(f"Success: {success} | Failed: {failed} | Total: {len(results)}")
     print(f"Logs: {LOG_DIR}/")
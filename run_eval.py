@@ -11,13 +11,17 @@ Usage:
     python run_eval.py --force            # re-evaluate even if results exist
     python run_eval.py --export-prompts   # export all prompts to prompts/ directory
     python run_eval.py --combo cc-sonnet4.6  # evaluate only one combo
+    python run_eval.py --jobs 4           # run 4 evaluations concurrently
 """
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
+import os
 import subprocess
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 from prompts import TASKS, get_prompt, get_all_combinations
@@ -25,6 +29,10 @@ from prompts import TASKS, get_prompt, get_all_combinations
 
 MODES = ["vanilla", "roam-cli", "roam-mcp"]
 
+# ("_<mode>", mode) pairs, longest first, for parsing <task_id>_<mode> dir names
+_MODE_SUFFIXES = tuple((f"_{m}", m) for m in sorted(MODES, key=len, reverse=True))
+_SUFFIXES = tuple(suffix for suffix, _ in _MODE_SUFFIXES)
+
 # Task groups for tagging results
 TASK_GROUPS = {
     "react-todo": "standard",
@@ -39,46 +47,66 @@ TASK_GROUPS = {
 BASE_DIR = Path(__file__).parent
 WORKSPACES_DIR = BASE_DIR / "workspaces"
 RESULTS_DIR = BASE_DIR / "results"
+_RESULTS_DIR_STR = str(RESULTS_DIR)
 PROMPTS_DIR = BASE_DIR / "prompts"
 COMBOS_FILE = BASE_DIR / "combos.json"
+EVALUATE_PY = str(BASE_DIR / "evaluate.py")
+
+
+@lru_cache(maxsize=1)
+def _load_combos_cached(path: Path, mtime_ns: int) -> dict:
+    return json.loads(path.read_bytes())
 
 
 def load_combos() -> dict:
-    """Load combo definitions from combos.json."""
-    if COMBOS_FILE.is_file():
-        return json.loads(COMBOS_FILE.read_text(encoding="utf-8"))
-    return {}
+    """Load combo definitions from combos.json.
+
+    Parsed once and reused until the file's mtime changes. The returned
+    dict is shared between callers, so treat it as read-only.
+    """
+    try:
+        mtime_ns = COMBOS_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    return _load_combos_cached(COMBOS_FILE, mtime_ns)
+
+
+def _subdirs(path) -> list[tuple[str, str]]:
+    """Sorted (name, path) of the non-hidden subdirectories of ``path``.
+
+    Uses os.scandir so the directory check comes from the listing itself
+    rather than a stat() per entry.
+    """
+    with os.scandir(path) as it:
+        entries = [(e.name, e.path) for e in it if not e.name.startswith(".") and e.is_dir()]
+    entries.sort()
+    return entries
 
 
 def discover_workspaces() -> list[dict]:
     """Auto-discover all workspaces from the filesystem.
 
     Scans workspaces/<combo_id>/<task_id>_<mode>/ directories.
-    Returns list of {combo, task, mode, path} dicts.
+    Returns list of {combo, task, mode, path, group} dicts; path is a str.
     """
     found = []
-    if not WORKSPACES_DIR.is_dir():
+    try:
+        combos = _subdirs(WORKSPACES_DIR)
+    except (FileNotFoundError, NotADirectoryError):
         return found
 
-    for combo_dir in sorted(WORKSPACES_DIR.iterdir()):
-        if not combo_dir.is_dir() or combo_dir.name.startswith("."):
-            continue
-        combo_id = combo_dir.name
-
-        for ws_dir in sorted(combo_dir.iterdir()):
-            if not ws_dir.is_dir() or ws_dir.name.startswith("."):
-                continue
+    for combo_id, combo_path in combos:
+        for name, ws_path in _subdirs(combo_path):
             # Parse <task_id>_<mode> directory name
-            name = ws_dir.name
             # Try known modes first (longest match)
             task_id = None
             mode = None
-            for m in sorted(MODES, key=len, reverse=True):
-                suffix = f"_{m}"
-                if name.endswith(suffix):
-                    task_id = name[:-len(suffix)]
-                    mode = m
-                    break
+            if name.endswith(_SUFFIXES):
+                for suffix, m in _MODE_SUFFIXES:
+                    if name.endswith(suffix):
+                        task_id = name[:-len(suffix)]
+                        mode = m
+                        break
             if not task_id:
                 # Assume vanilla if no mode suffix
                 task_id = name
@@ -88,15 +116,38 @@ def discover_workspaces() -> list[dict]:
                 "combo": combo_id,
                 "task": task_id,
                 "mode": mode,
-                "path": ws_dir,
+                "path": ws_path,  # plain str: only ever used as an argv element
                 "group": TASK_GROUPS.get(task_id, "standard"),
             })
 
     return found
 
 
-def result_path(combo: str, task_id: str, mode: str) -> Path:
-    return RESULTS_DIR / f"{combo}_{task_id}_{mode}.json"
+def has_result_files() -> bool:
+    """True if results/ holds at least one result JSON (stops at the first)."""
+    try:
+        with os.scandir(RESULTS_DIR) as it:
+            return any(e.name.endswith(".json") and e.is_file() for e in it)
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+
+
+def result_name(combo: str, task_id: str, mode: str) -> str:
+    return f"{combo}_{task_id}_{mode}.json"
+
+
+def result_path(combo: str, task_id: str, mode: str) -> str:
+    # A plain str: it only ever ends up as an argv element for evaluate.py
+    return os.path.join(_RESULTS_DIR_STR, result_name(combo, task_id, mode))
+
+
+def existing_results() -> set[str]:
+    """File names of all result JSONs, from one listing of results/."""
+    try:
+        with os.scandir(RESULTS_DIR) as it:
+            return {e.name for e in it if e.name.endswith(".json") and e.is_file()}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
 
 
 def list_status():
@@ -108,23 +159,27 @@ def list_status():
         print("No workspaces found. Create directories under workspaces/<combo>/<task>_<mode>/")
         return
 
-    print(f"{'Combo':<20} {'Task':<18} {'Mode':<10} {'Group':<10} {'Evaluated':<10} {'Combo Info'}")
-    print("-" * 95)
+    # Rows are collected and written in one go rather than printed one by one
+    rows = [f"{'Combo':<20} {'Task':<18} {'Mode':<10} {'Group':<10} {'Evaluated':<10} {'Combo Info'}",
+            "-" * 95]
 
+    # One listing of results/ instead of stat()ing each workspace's result
+    existing = existing_results()
     done = 0
     for ws in workspaces:
-        rs = result_path(ws["combo"], ws["task"], ws["mode"])
-        rs_status = "YES" if rs.is_file() else "no"
-        if rs.is_file():
+        evaluated = result_name(ws["combo"], ws["task"], ws["mode"]) in existing
+        rs_status = "YES" if evaluated else "no"
+        if evaluated:
             done += 1
 
         meta = combos_meta.get(ws["combo"], {})
         info = f"{meta.get('cli', '?')} / {meta.get('model', '?')}" if meta else "(not in combos.json)"
 
-        print(f"{ws['combo']:<20} {ws['task']:<18} {ws['mode']:<10} "
-              f"{ws['group']:<10} {rs_status:<10} {info}")
+        rows.append(f"{ws['combo']:<20} {ws['task']:<18} {ws['mode']:<10} "
+                    f"{ws['group']:<10} {rs_status:<10} {info}")
 
-    print(f"\nTotal workspaces: {len(workspaces)} | Evaluated: {done}")
+    rows.append(f"\nTotal workspaces: {len(workspaces)} | Evaluated: {done}")
+    sys.stdout.write("\n".join(rows) + "\n")
 
     # Show combos from combos.json that have no workspaces
     ws_combos = {w["combo"] for w in workspaces}
@@ -133,17 +188,23 @@ def list_status():
         print(f"\nCombos in combos.json without workspaces: {', '.join(missing)}")
 
 
+def _write_if_changed(path: Path, text: str) -> bool:
+    """Write ``text`` to ``path`` unless it already holds exactly that; True if written."""
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
 def export_prompts():
     """Export all prompts to text files."""
     PROMPTS_DIR.mkdir(parents=True, exist_ok=True)
 
-    for task_id in TASKS:
-        for mode in MODES:
-            prompt = get_prompt(task_id, mode)
-            filename = f"{task_id}_{mode}.txt"
-            (PROMPTS_DIR / filename).write_text(prompt, encoding="utf-8")
-
-    # Master file with all prompts
+    # One pass: each prompt is generated once, written to its own file and
+    # collected for the master file with all prompts
     master = []
     for task_id, task in TASKS.items():
         master.append(f"{'=' * 80}")
@@ -151,19 +212,113 @@ def export_prompts():
         master.append(f"Language: {task['language']}")
         master.append(f"{'=' * 80}\n")
         for mode in MODES:
+            prompt = get_prompt(task_id, mode)
+            _write_if_changed(PROMPTS_DIR / f"{task_id}_{mode}.txt", prompt)
             master.append(f"--- MODE: {mode} ---\n")
-            master.append(get_prompt(task_id, mode))
+            master.append(prompt)
             master.append("")
 
-    (PROMPTS_DIR / "_all_prompts.txt").write_text("\n".join(master), encoding="utf-8")
+    _write_if_changed(PROMPTS_DIR / "_all_prompts.txt", "\n".join(master))
 
     count = len(TASKS) * len(MODES)
     print(f"Exported {count} prompts to {PROMPTS_DIR}/")
     print(f"Master file: {PROMPTS_DIR / '_all_prompts.txt'}")
 
 
-def evaluate_all(force: bool = False, combo_filter: str | None = None):
-    """Evaluate all discovered workspaces."""
+def combo_eval_args(meta: dict) -> list[str]:
+    """evaluate.py flags that depend only on the combo (from combos.json)."""
+    args = []
+    if meta.get("cli"):
+        args.extend(["--cli-cmd", meta["cli"]])
+    if meta.get("model"):
+        args.extend(["--model", meta["model"]])
+    return args
+
+
+def build_eval_cmd(ws: dict, rs: str, combo_args: list[str]) -> list[str]:
+    """evaluate.py command line for one workspace."""
+    return [
+        sys.executable, EVALUATE_PY,
+        ws["path"],
+        "--agent", ws["combo"],
+        "--mode", ws["mode"],
+        "--task", ws["task"],
+        "--group", ws["group"],
+        "--output", rs,
+        *combo_args,
+    ]
+
+
+def _print_header(ws: dict):
+    print(f"\n{'=' * 60}")
+    print(f"Evaluating: {ws['combo']} / {ws['task']} / {ws['mode']}")
+    print(f"{'=' * 60}")
+
+
+def _check(returncode: int | None, label: str = "") -> bool:
+    """Report a failed or timed-out evaluation; True on success."""
+    prefix = f"{label} " if label else "  "
+    if returncode is None:
+        print(f"{prefix}TIMEOUT")
+        return False
+    if returncode != 0:
+        print(f"{prefix}FAILED (exit code {returncode})")
+        return False
+    return True
+
+
+async def _echo_lines(stream: asyncio.StreamReader, label: str):
+    """Print a child's output line by line, each tagged with its workspace."""
+    while True:
+        line = await stream.readline()
+        if not line:
+            break
+        print(f"{label} {line.decode('utf-8', errors='replace').rstrip()}")
+
+
+async def run_one(ws: dict, cmd: list[str], sem: asyncio.Semaphore, prefixed: bool) -> bool:
+    """Run evaluate.py for one workspace; True on success.
+
+    With ``prefixed`` (parallel runs) the child's output is streamed line by
+    line, each line tagged ``[combo/task/mode]``, so concurrent evaluations
+    stay readable; otherwise it goes straight to the terminal.
+    """
+    label = f"[{ws['combo']}/{ws['task']}/{ws['mode']}]" if prefixed else ""
+    async with sem:
+        if prefixed:
+            print(f"{label} evaluating")
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+                limit=1 << 24,  # tolerate very long lines from roam output
+            )
+            echo = asyncio.ensure_future(_echo_lines(proc.stdout, label))
+        else:
+            _print_header(ws)
+            proc = await asyncio.create_subprocess_exec(*cmd)
+            echo = None
+        try:
+            returncode = await asyncio.wait_for(proc.wait(), timeout=600)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            returncode = None
+        if echo is not None:
+            await echo
+        return _check(returncode, label)
+
+
+async def evaluate_pending(pending: list[tuple[dict, list[str]]], jobs: int) -> int:
+    """Run the pending (workspace, command) pairs, ``jobs`` at a time; return successes."""
+    # Each evaluation only waits on its evaluate.py child, so one event loop
+    # drives them all; the semaphore caps how many run at once.
+    sem = asyncio.Semaphore(max(1, jobs))
+    prefixed = jobs > 1
+    done = await asyncio.gather(*(run_one(ws, cmd, sem, prefixed) for ws, cmd in pending))
+    return sum(done)
+
+
+def evaluate_all(force: bool = False, combo_filter: str | None = None, jobs: int = 1):
+    """Evaluate all discovered workspaces, running up to ``jobs`` at once."""
     RESULTS_DIR.mkdir(parents=True, exist_ok=True)
 
     combos_meta = load_combos()
@@ -176,51 +331,28 @@ def evaluate_all(force: bool = False, combo_filter: str | None = None):
         print("No workspaces found to evaluate.")
         return
 
-    evaluated = 0
     skipped = 0
-
+    pending = []
+    existing = set() if force else existing_results()
+    args_by_combo: dict[str, list[str]] = {}  # combo flags, built once per combo
     for ws in workspaces:
-        rs = result_path(ws["combo"], ws["task"], ws["mode"])
-
-        if rs.is_file() and not force:
+        name = result_name(ws["combo"], ws["task"], ws["mode"])
+        if name in existing:
             skipped += 1
             continue
 
-        print(f"\n{'=' * 60}")
-        print(f"Evaluating: {ws['combo']} / {ws['task']} / {ws['mode']}")
-        print(f"{'=' * 60}")
-
-        # Build evaluate.py args
-        cmd = [
-            sys.executable, str(BASE_DIR / "evaluate.py"),
-            str(ws["path"]),
-            "--agent", ws["combo"],
-            "--mode", ws["mode"],
-            "--task", ws["task"],
-            "--group", ws["group"],
-            "--output", str(rs),
-        ]
-
-        # Pass cli-cmd and model from combos.json if available
-        meta = combos_meta.get(ws["combo"], {})
-        if meta.get("cli"):
-            cmd.extend(["--cli-cmd", meta["cli"]])
-        if meta.get("model"):
-            cmd.extend(["--model", meta["model"]])
+        combo_args = args_by_combo.get(ws["combo"])
+        if combo_args is None:
+            combo_args = args_by_combo[ws["combo"]] = combo_eval_args(combos_meta.get(ws["combo"], {}))
+        rs = result_path(ws["combo"], ws["task"], ws["mode"])
+        pending.append((ws, build_eval_cmd(ws, rs, combo_args)))
 
-        try:
-            result = subprocess.run(cmd, timeout=600)
-            if result.returncode == 0:
-                evaluated += 1
-            else:
-                print(f"  FAILED (exit code {result.returncode})")
-        except subprocess.TimeoutExpired:
-            print(f"  TIMEOUT")
+    evaluated = asyncio.run(evaluate_pending(pending, jobs))
 
     print(f"\nDone. Evaluated: {evaluated}, Skipped (already done): {skipped}")
 
     # Generate report
-    if any(RESULTS_DIR.glob("*.json")):
+    if has_result_files():
         print("\nGenerating comparison report...")
         subprocess.run([
             sys.executable, str(BASE_DIR / "compare.py"),
@@ -235,6 +367,8 @@ def main():
     parser.add_argument("--export-prompts", action="store_true", help="Export prompts to files")
     parser.add_argument("--force", action="store_true", help="Re-evaluate even if results exist")
     parser.add_argument("--combo", type=str, help="Evaluate only this combo ID")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Evaluations to run concurrently (default: 1, serial)")
     args = parser.parse_args()
 
     if args.list:
@@ -242,7 +376,7 @@ def main():
     elif args.export_prompts:
         export_prompts()
     else:
-        evaluate_all(force=args.force, combo_filter=args.combo)
+        evaluate_all(force=args.force, combo_filter=args.combo, jobs=args.jobs)
 
 
 if __name__ == "__main__":
@@ -13,6 +13,37 @@ Score breakdown (100 points total):
 """
 from __future__ import annotations
 
+from bisect import bisect_right
+
+
+# Capped linear penalties: a metric above its threshold costs `per_unit`
+# points per unit over, up to `cap`. Missing (None) metrics cost nothing.
+#   (metric, threshold, per_unit, cap)
+QUALITY_PENALTIES = (
+    ("dead_symbols", 0, 2, 8),            # -2 per dead symbol, max -8
+    ("avg_complexity", 5, 1, 6),          # -1 per avg complexity point above 5, max -6
+    ("p90_complexity", 15, 1, 4),         # -1 per point above 15, max -4
+    ("high_complexity_count", 0, 2, 5),   # -2 per function with high complexity, max -5
+)
+ARCHITECTURE_PENALTIES = (
+    ("tangle_ratio", 0, 10, 5),           # scales with ratio (0.0 = perfect, 1.0 = terrible)
+    ("critical_issues", 0, 3, 10),        # -3 per critical issue, max -10
+)
+
+# Letter grade cut-offs: A (90+), B (80+), C (70+), D (60+), F (<60)
+_GRADE_THRESHOLDS = (60, 70, 80, 90)
+_GRADES = ("F", "D", "C", "B", "A")
+
+
+def _apply_penalties(score: float, scores: dict, rules: tuple) -> float:
+    """Subtract each rule's capped penalty from ``score``, in table order."""
+    get = scores.get
+    for metric, threshold, per_unit, cap in rules:
+        value = get(metric)
+        if value is not None:
+            score -= min(max(value - threshold, 0) * per_unit, cap)
+    return score
+
 
 def compute_aqs(result: dict) -> dict:
     """Compute Agent Quality Score from an evaluation result.
@@ -38,42 +69,14 @@ def compute_aqs(result: dict) -> dict:
         breakdown["health"] = 0
 
     # --- 2. Code Quality (20 pts) ---
-    quality_score = 20.0
-
-    # Dead code penalty: -2 per dead symbol, max -8
-    dead = scores.get("dead_symbols")
-    if dead is not None and dead > 0:
-        quality_score -= min(dead * 2, 8)
-
-    # Complexity penalty: -1 per avg complexity point above 5, max -6
-    avg_cx = scores.get("avg_complexity")
-    if avg_cx is not None and avg_cx > 5:
-        quality_score -= min((avg_cx - 5) * 1, 6)
-
-    # P90 complexity penalty: -1 per point above 15, max -4
-    p90_cx = scores.get("p90_complexity")
-    if p90_cx is not None and p90_cx > 15:
-        quality_score -= min((p90_cx - 15) * 1, 4)
-
-    # High complexity count penalty: -2 per function with high complexity, max -5
-    hi_cx = scores.get("high_complexity_count")
-    if hi_cx is not None and hi_cx > 0:
-        quality_score -= min(hi_cx * 2, 5)
+    # Dead code, average / P90 complexity and high-complexity count penalties
+    quality_score = _apply_penalties(20.0, scores, QUALITY_PENALTIES)
 
     breakdown["quality"] = max(0, round(quality_score))
 
     # --- 3. Architecture (15 pts) ---
-    arch_score = 15.0
-
-    # Tangle ratio penalty: scales with ratio (0.0 = perfect, 1.0 = terrible)
-    tangle = scores.get("tangle_ratio")
-    if tangle is not None and tangle > 0:
-        arch_score -= min(tangle * 10, 5)
-
-    # Critical issues penalty: -3 per critical issue
-    crit = scores.get("critical_issues")
-    if crit is not None and crit > 0:
-        arch_score -= min(crit * 3, 10)
+    # Tangle ratio and critical issues penalties
+    arch_score = _apply_penalties(15.0, scores, ARCHITECTURE_PENALTIES)
 
     # File structure: too few files = not well-structured
     total_files = file_stats.get("total_files", 0)
@@ -145,16 +148,7 @@ def compute_aqs(result: dict) -> dict:
     total = min(100, max(0, total))
 
     # Letter grade
-    if total >= 90:
-        grade = "A"
-    elif total >= 80:
-        grade = "B"
-    elif total >= 70:
-        grade = "C"
-    elif total >= 60:
-        grade = "D"
-    else:
-        grade = "F"
+    grade = _GRADES[bisect_right(_GRADE_THRESHOLDS, total)]
 
     return {
         "aqs": total,